@@ -0,0 +1,229 @@
+"""Compact in-memory storage for the homes and communities datasets.
+
+Records are kept column-wise instead of as a list of dicts. Columns with
+repeated values (builder names, states, stages, booleans, empty strings) are
+dictionary-encoded: each distinct value is stored once and rows hold a small
+integer code in an ``array``. Columns that are mostly unique keep a plain
+tuple of values. Dicts are only rebuilt at serialization time via ``to_dicts``.
+
+Run ``python -m server.dataset_store`` for a bytes-per-record benchmark.
+"""
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# A column is dictionary-encoded when its distinct values are at most this
+# fraction of its rows. Lookup columns like Builder_Name fall well under it.
+ENCODE_RATIO = 0.5
+
+
+def _typecode_for(size: int) -> str:
+    if size <= 0xFF:
+        return "B"
+    if size <= 0xFFFF:
+        return "H"
+    return "I"
+
+
+class CompactDataset:
+    """Column-oriented, interned store for a list of flat records sharing one key set"""
+
+    __slots__ = ("fields", "_pools", "_columns", "_length")
+
+    def __init__(self, fields: Sequence[str], pools: List[Optional[tuple]], columns: List[Any], length: int):
+        self.fields: Tuple[str, ...] = tuple(fields)
+        # pools[i] is the distinct-value table for an encoded column, else None
+        self._pools = pools
+        self._columns = columns
+        self._length = length
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> "CompactDataset":
+        if fields is None:
+            fields = list(records[0].keys()) if records else []
+        # Every record must have exactly these keys, or to_dicts() couldn't
+        # reproduce it (extra keys would be dropped, missing ones added)
+        expected = set(fields)
+        for position, record in enumerate(records):
+            if record.keys() != expected:
+                raise ValueError(f"Record {position} keys do not match dataset fields: {sorted(record.keys() ^ expected)}")
+        length = len(records)
+        pools: List[Optional[tuple]] = []
+        columns: List[Any] = []
+        for field in fields:
+            values = [record[field] for record in records]
+            pool, column = cls._encode_column(values, length)
+            pools.append(pool)
+            columns.append(column)
+        return cls(fields, pools, columns, length)
+
+    @staticmethod
+    def _encode_column(values: List[Any], length: int) -> Tuple[Optional[tuple], Any]:
+        # Keyed on (type, value) so True, 1 and 1.0 don't collapse into one entry
+        table: Dict[Tuple[type, Any], int] = {}
+        pool_values: List[Any] = []
+        codes: List[int] = []
+        try:
+            for value in values:
+                key = (type(value), value)
+                code = table.get(key)
+                if code is None:
+                    code = table[key] = len(pool_values)
+                    pool_values.append(value)
+                codes.append(code)
+        except TypeError:
+            # Unhashable values (nested dicts/lists) are stored as-is
+            return None, tuple(values)
+
+        if length and len(pool_values) > length * ENCODE_RATIO:
+            return None, tuple(values)
+
+        pool = tuple(sys.intern(v) if type(v) is str else v for v in pool_values)
+        return pool, array(_typecode_for(len(pool)), codes)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, field: str) -> List[Any]:
+        """Decode a single column to a list of values"""
+        index = self.fields.index(field)
+        pool, data = self._pools[index], self._columns[index]
+        if pool is not None:
+            return [pool[code] for code in data]
+        return list(data)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize the records as a list of dicts (for JSON responses)"""
+        if not self._length:
+            return []
+        fields = self.fields
+        decoded = [self.column(field) for field in fields]
+        return [dict(zip(fields, row)) for row in zip(*decoded)]
+
+
+class DatasetCache:
+    """TTL cache of named CompactDatasets; a ttl of 0 disables caching"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, CompactDataset]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[CompactDataset]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            expires_at, dataset = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[name]
+                return None
+            return dataset
+
+    def put(self, name: str, records: Sequence[Dict[str, Any]]) -> Optional[CompactDataset]:
+        if self.ttl <= 0:
+            return None
+        dataset = CompactDataset.from_records(records)
+        with self._lock:
+            self._entries[name] = (time.monotonic() + self.ttl, dataset)
+        return dataset
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate retained size of obj, counting shared objects once"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, CompactDataset):
+        size += (deep_sizeof(obj.fields, seen) + deep_sizeof(obj._pools, seen)
+                 + deep_sizeof(obj._columns, seen))
+    return size
+
+
+def bytes_per_record(records: Sequence[Dict[str, Any]]) -> Dict[str, float]:
+    """Compare bytes per record of a list of dicts against a CompactDataset"""
+    count = max(len(records), 1)
+    # Build fresh copies so string sharing with the caller doesn't skew the numbers
+    as_dicts = [{k: (v[:1] + v[1:] if type(v) is str else v) for k, v in r.items()} for r in records]
+    compact = CompactDataset.from_records(as_dicts)
+    return {
+        "dicts": deep_sizeof(as_dicts) / count,
+        "compact": deep_sizeof(compact) / count,
+    }
+
+
+def sample_homes(count: int) -> Iterable[Dict[str, Any]]:
+    """Synthetic homes records shaped like get_homes output, for benchmarks"""
+    builders = ["Lennar", "Pulte Homes", "KB Home", "Taylor Morrison", "Meritage Homes"]
+    stages = ["Design", "Permitting", "Installation", "Inspection", "PTO", "Complete"]
+    states = ["CA", "TX", "FL", "AZ", "NV", "CO"]
+    utilities = ["PG&E", "SCE", "SDG&E", "Oncor", "FPL", "APS", "NV Energy"]
+    for i in range(count):
+        yield {
+            "New_Home_Project_Id": f"a0X5e00000{i:08d}",
+            "New_Home_Project_Name": f"NHP-{i:06d}",
+            "Project_Stage": stages[i % len(stages)],
+            "Community_Name": f"Community {i % 120}",
+            "Builder_Name": builders[i % len(builders)],
+            "Builder_Division": f"Division {i % 40}",
+            "Account_Name": f"Account {i % 60}",
+            "AHJ_Name": f"AHJ {i % 200}",
+            "Utility_Name": utilities[i % len(utilities)],
+            "Service_Voltage": "240V",
+            "Street_Address": f"{100 + i} Main Street",
+            "Street_Address_2": None,
+            "City": f"City {i % 150}",
+            "State": states[i % len(states)],
+            "Zip": f"{90000 + i % 900:05d}",
+            "Country": "United States",
+            "Phase": f"Phase {i % 4}",
+            "Building_Number": None,
+            "Lot_Number": f"{i % 500}",
+            "APN_Number": f"{i:03d}-{i % 97:03d}-{i % 13:02d}",
+            "County": f"County {i % 50}",
+            "Application_ID": f"APP-{i:07d}",
+            "Embedded_URL": None,
+            "Installer_Name": f"Installer {i % 25}",
+            "Partner_Name": f"Partner {i % 10}",
+            "Primary_PV_Prod_Name": "Q.TRON BLK M-G2+ 430",
+            "Electrical_Name": f"Electrical {i % 15}",
+            "Plan_Type_Name": f"PT-{i % 300}",
+            "Finance_Type": "Cash" if i % 3 else "Lease",
+            "Installer_Partner_PV": f"Installer {i % 25}",
+            "Installer_Partner_Battery": None,
+            "Model_Home": i % 50 == 0,
+            "Legal_Owner": "Builder",
+            "New_Home_Build": True,
+            "Non_Solar_Home": False,
+            "Estimated_COE_Date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "Actual_COE_Date": None,
+            "Primary_Contact_Name": f"Contact {i}",
+            "Primary_Phone_Number": f"555-{i % 10000:04d}",
+            "Email": f"contact{i}@example.com",
+            "Customer_Notes": None,
+            "Welcome_Email_Sent": i % 2 == 0,
+            "PTO_Email_Sent": i % 4 == 0,
+        }
+
+
+if __name__ == "__main__":
+    for n in (1_000, 10_000):
+        result = bytes_per_record(list(sample_homes(n)))
+        ratio = result["dicts"] / result["compact"]
+        print(f"{n:>6} homes: dicts {result['dicts']:,.0f} B/record, "
+              f"compact {result['compact']:,.0f} B/record ({ratio:.1f}x smaller)")
@@ -2,19 +2,24 @@ import os
 import json
 import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import jwt
 import requests
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 
+from server.dataset_store import DatasetCache
+from server.static_assets import HASHED_PREFIX, AssetManifest
+from server.soql import QueryCache, TemplateError, TemplateRegistry, cache_key
+
 # Load .env
 load_dotenv()
 
@@ -37,6 +42,34 @@ USERNAME = (os.getenv("SALESFORCE_USERNAME") or "").strip()
 KEY_PATH = os.getenv("SALESFORCE_JWT_KEY_PATH", "").strip()
 PRIVATE_KEY_CONTENT = os.getenv("SALESFORCE_PRIVATE_KEY", "").strip()  # Direct key content
 DEFAULT_TEST_SOQL = os.getenv("DEFAULT_TEST_SOQL", "SELECT Id, Name FROM Account LIMIT 5").strip()
+DATASET_CACHE_TTL = int(os.getenv("DATASET_CACHE_TTL_SECONDS", "300"))
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "60"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Homes and communities are held in compact column form between requests
+dataset_cache = DatasetCache(ttl=DATASET_CACHE_TTL)
+
+# Results of /api/sf/query, bounded by serialized size
+query_cache = QueryCache(max_bytes=QUERY_CACHE_MAX_BYTES, ttl=QUERY_CACHE_TTL)
+
+# Named SOQL templates with safely bound :params
+query_templates = TemplateRegistry()
+query_templates.register("divisions_by_builder", """
+    SELECT
+        Id,
+        Name,
+        Division_Address__c,
+        National_Builder__c,
+        National_Builder__r.Name,
+        National_Builder__r.Service_Territories__c,
+        National_Builder__r.Builder_ID_Code__c,
+        National_Builder__r.Headquarters_Address__c,
+        National_Builder__r.National_Account_Status__c,
+        National_Builder__r.Account_Manager__c,
+        National_Builder__r.Account_Manager__r.Name
+    FROM Division__c
+    WHERE National_Builder__c = :builder_id
+""")
 
 # FastAPI app
 app = FastAPI(title="SF JWT Proxy")
@@ -105,7 +138,23 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 WEB_DIR = ROOT_DIR / "web"
 ASSETS_DIR = ROOT_DIR / "assets"
 
-# Mount static directories if present
+# Fingerprint and pre-compress static files once at startup
+asset_manifest = AssetManifest()
+asset_manifest.add_directory(WEB_DIR, "/static")
+asset_manifest.add_directory(ASSETS_DIR, "/assets")
+asset_manifest.set_index(WEB_DIR / "index.html")
+
+
+# Content-hashed URLs referenced by the rewritten index.html
+@app.api_route(HASHED_PREFIX + "/{asset_path:path}", methods=["GET", "HEAD"])
+def serve_hashed_asset(asset_path: str, request: Request):
+    asset = asset_manifest.get(asset_path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return asset.response(request)
+
+
+# Mount static directories if present (unhashed URLs, kept for direct links)
 if WEB_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(WEB_DIR), html=False), name="static")
 if ASSETS_DIR.exists():
@@ -113,16 +162,26 @@ if ASSETS_DIR.exists():
 
 # Serve the SPA index
 @app.get("/")
-def serve_index():
-    index_path = WEB_DIR / "index.html"
-    if not index_path.exists():
+def serve_index(request: Request):
+    if asset_manifest.index is None:
         return {"message": "Frontend not built yet"}
-    return FileResponse(str(index_path))
+    return asset_manifest.index.response(request)
 
 
 class QueryRequest(BaseModel):
-    soql: str
+    soql: Optional[str] = None
+    template: Optional[str] = None
+    params: Optional[Dict[str, Any]] = None
     tooling: Optional[bool] = False
+    cache: Optional[bool] = True
+
+    @model_validator(mode="after")
+    def check_query_source(self):
+        if bool(self.soql) == bool(self.template):
+            raise ValueError("Provide exactly one of 'soql' or 'template'")
+        if self.params and not self.template:
+            raise ValueError("'params' can only be used with 'template'")
+        return self
 
 
 def mint_access_token(login_url: str, client_id: str, username: str, key_path: str, key_content: str = "") -> dict:
@@ -228,6 +287,22 @@ def log_frontend_error(error: ErrorLog):
 
 @app.post("/api/sf/query")
 def sf_query(req: QueryRequest):
+    if req.template:
+        try:
+            template = query_templates.get(req.template)
+            soql = template.render(req.params)
+        except TemplateError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        soql = req.soql
+    key = cache_key(soql, tooling=req.tooling)
+
+    use_cache = req.cache and query_cache.enabled
+    if use_cache:
+        cached = query_cache.get(key)
+        if cached is not None:
+            return Response(cached, media_type="application/json")
+
     try:
         auth = mint_access_token(LOGIN_URL, CLIENT_ID, USERNAME, KEY_PATH, PRIVATE_KEY_CONTENT)
     except HTTPException:
@@ -246,11 +321,16 @@ def sf_query(req: QueryRequest):
 
     # Tooling API support if requested
     if req.tooling:
-        result = sf.toolingexecute("query", method="GET", params={"q": req.soql})
-        return result
-
-    # Standard query
-    result = sf.query_all(req.soql)
+        result = sf.toolingexecute("query", method="GET", params={"q": soql})
+    else:
+        # Standard query
+        result = sf.query_all(soql)
+
+    if use_cache:
+        # Encode once; the cache holds the body bytes that are sent
+        response = JSONResponse(jsonable_encoder(result))
+        query_cache.put(key, response.body)
+        return response
     return result
 
 
@@ -312,6 +392,13 @@ def get_builders():
 @app.get("/api/sf/communities")
 def get_communities():
     """Get all Divisions with parent (National Builder) fields"""
+    cached = dataset_cache.get("communities")
+    if cached is not None:
+        return {
+            "communities": cached.to_dicts(),
+            "totalSize": len(cached)
+        }
+
     try:
         auth = mint_access_token(LOGIN_URL, CLIENT_ID, USERNAME, KEY_PATH, PRIVATE_KEY_CONTENT)
     except HTTPException:
@@ -370,6 +457,8 @@ def get_communities():
             "National_Builder__c": record.get('National_Builder__c', ''),
         }
         communities.append(community)
+
+    dataset_cache.put("communities", communities)
     
     return {
         "communities": communities,
@@ -396,22 +485,7 @@ def get_divisions(builder_id: str):
     sf = Salesforce(instance_url=auth["instance_url"], session_id=auth["access_token"])
 
     # Query Divisions with parent (National Builder) fields
-    soql = f"""
-    SELECT
-        Id,
-        Name,
-        Division_Address__c,
-        National_Builder__c,
-        National_Builder__r.Name,
-        National_Builder__r.Service_Territories__c,
-        National_Builder__r.Builder_ID_Code__c,
-        National_Builder__r.Headquarters_Address__c,
-        National_Builder__r.National_Account_Status__c,
-        National_Builder__r.Account_Manager__c,
-        National_Builder__r.Account_Manager__r.Name
-    FROM Division__c
-    WHERE National_Builder__c = '{builder_id}'
-    """
+    soql = query_templates.get("divisions_by_builder").render({"builder_id": builder_id})
 
     result = sf.query_all(soql)
     records = result.get('records', [])
@@ -458,6 +532,13 @@ def get_homes():
     """
     Fetch all New Home Projects with related lookups
     """
+    cached = dataset_cache.get("homes")
+    if cached is not None:
+        return {
+            "homes": cached.to_dicts(),
+            "totalSize": len(cached)
+        }
+
     try:
         auth = mint_access_token(LOGIN_URL, CLIENT_ID, USERNAME, KEY_PATH, PRIVATE_KEY_CONTENT)
     except HTTPException:
@@ -577,6 +658,8 @@ def get_homes():
             "PTO_Email_Sent": record.get('Permission_to_Operate_Email_Sent__c', False),
         }
         homes.append(home)
+
+    dataset_cache.put("homes", homes)
     
     return {
         "homes": homes,
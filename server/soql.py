@@ -0,0 +1,187 @@
+"""Parameterized SOQL templates and a result cache for Salesforce queries.
+
+Templates use ``:name`` placeholders which are bound to escaped SOQL
+literals, so values such as a builder id are never interpolated as raw text.
+Query results are cached as encoded JSON bytes in an LRU with a TTL, so the
+byte budget counts exactly the memory the cached bodies occupy and cache
+hits are sent without re-encoding.
+"""
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple
+
+PLACEHOLDER = re.compile(r"(?<![\w:]):([A-Za-z_]\w*)")
+WHITESPACE = re.compile(r"\s+")
+
+# Backslash must come first so the other escapes are not doubled
+_ESCAPES = [("\\", "\\\\"), ("'", "\\'"), ("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t")]
+
+
+class TemplateError(ValueError):
+    """Raised for unknown templates or missing/invalid parameters"""
+
+
+def _split_literals(soql: str) -> Iterator[Tuple[bool, str]]:
+    """Yield (is_string_literal, text) segments of a SOQL statement"""
+    start = 0
+    i = 0
+    while i < len(soql):
+        if soql[i] == "'":
+            if i > start:
+                yield False, soql[start:i]
+            j = i + 1
+            while j < len(soql) and soql[j] != "'":
+                j += 2 if soql[j] == "\\" else 1
+            yield True, soql[i:j + 1]
+            start = i = j + 1
+        else:
+            i += 1
+    if start < len(soql):
+        yield False, soql[start:]
+
+
+def normalize_soql(soql: str) -> str:
+    """Collapse whitespace outside string literals so equivalent queries share a key"""
+    parts = [text if literal else WHITESPACE.sub(" ", text) for literal, text in _split_literals(soql)]
+    return "".join(parts).strip()
+
+
+def soql_literal(value: Any) -> str:
+    """Render a Python value as a SOQL literal"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise TemplateError(f"Cannot bind non-finite number: {value}")
+        # SOQL has no exponent notation, so always write plain digits
+        return format(Decimal(repr(value)), "f")
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if not value:
+            raise TemplateError("Cannot bind an empty list")
+        return "(" + ", ".join(soql_literal(v) for v in value) + ")"
+    if isinstance(value, str):
+        for raw, escaped in _ESCAPES:
+            value = value.replace(raw, escaped)
+        return f"'{value}'"
+    raise TemplateError(f"Unsupported parameter type: {type(value).__name__}")
+
+
+class QueryTemplate:
+    """A named SOQL statement with ``:name`` placeholders"""
+
+    def __init__(self, name: str, soql: str):
+        self.name = name
+        self.soql = normalize_soql(soql)
+        self.params = sorted({
+            match.group(1)
+            for literal, text in _split_literals(self.soql) if not literal
+            for match in PLACEHOLDER.finditer(text)
+        })
+
+    def render(self, params: Optional[Mapping[str, Any]] = None) -> str:
+        params = params or {}
+        missing = [name for name in self.params if name not in params]
+        if missing:
+            raise TemplateError(f"Missing parameters for '{self.name}': {', '.join(missing)}")
+        unknown = [name for name in params if name not in self.params]
+        if unknown:
+            raise TemplateError(f"Unknown parameters for '{self.name}': {', '.join(unknown)}")
+
+        def bind(match: "re.Match[str]") -> str:
+            return soql_literal(params[match.group(1)])
+
+        return "".join(
+            text if literal else PLACEHOLDER.sub(bind, text)
+            for literal, text in _split_literals(self.soql)
+        )
+
+
+class TemplateRegistry:
+    def __init__(self):
+        self._templates: Dict[str, QueryTemplate] = {}
+
+    def register(self, name: str, soql: str) -> QueryTemplate:
+        template = QueryTemplate(name, soql)
+        self._templates[name] = template
+        return template
+
+    def get(self, name: str) -> QueryTemplate:
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise TemplateError(f"Unknown query template: {name}") from None
+
+    def names(self) -> List[str]:
+        return sorted(self._templates)
+
+
+def cache_key(soql: str, tooling: bool = False) -> Hashable:
+    """Key on the normalized, fully bound SOQL and which API is queried"""
+    return (bool(tooling), normalize_soql(soql))
+
+
+class QueryCache:
+    """LRU + TTL cache of encoded JSON response bodies bounded by total bytes"""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if time.monotonic() >= expires_at:
+                self._evict(key)
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Hashable, body: bytes) -> bool:
+        """Store an encoded body; returns False if caching is off or it doesn't fit"""
+        if not self.enabled or len(body) > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _evict(self, key: Hashable) -> None:
+        _, body = self._entries.pop(key)
+        self.size -= len(body)
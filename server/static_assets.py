@@ -0,0 +1,171 @@
+"""Fingerprinted, pre-compressed serving of the frontend and image assets.
+
+At startup every file under ``web/`` and ``assets/`` is read once, hashed and
+kept in memory together with gzip (and brotli, when installed) variants.
+Each file is served under a content-hashed URL such as
+``/hashed/static/app.1a2b3c4d5e.js`` with ``Cache-Control: immutable``, and
+``index.html`` is rewritten to point at those URLs. The index itself is sent
+with ``no-cache`` plus an ETag, so a repeat page load is a single 304 and no
+asset requests at all.
+"""
+import gzip
+import hashlib
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+HASHED_PREFIX = "/hashed"
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Already-compressed formats gain nothing from gzip/brotli
+SKIP_COMPRESSION = {".jpeg", ".jpg", ".png", ".webp", ".gif", ".woff", ".woff2", ".ico"}
+MIN_COMPRESS_SIZE = 512
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    codings: Dict[str, float] = {}
+    for token in header.split(","):
+        name, _, params = token.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[name] = q
+    return codings
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of If-None-Match against an entity tag"""
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class Asset:
+    """One file held in memory with its precomputed encodings"""
+
+    __slots__ = ("media_type", "digest", "cache_control", "encodings")
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str, compress: bool):
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.cache_control = cache_control
+        self.encodings: Dict[str, bytes] = {"identity": body}
+        if compress and len(body) >= MIN_COMPRESS_SIZE:
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                self.encodings["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(body, quality=11)
+                if len(br) < len(body):
+                    self.encodings["br"] = br
+
+    def etag(self, encoding: str) -> str:
+        """Strong ETag, distinct for each encoded representation"""
+        if encoding == "identity":
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def select_encoding(self, accept_encoding: str) -> str:
+        """Pick the best precomputed encoding the client accepts (q > 0)"""
+        accepted = _parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best, best_q = "identity", 0.0
+        # br is listed first so it wins ties with gzip
+        for encoding in ("br", "gzip"):
+            if encoding not in self.encodings:
+                continue
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def response(self, request: Request) -> Response:
+        encoding = self.select_encoding(request.headers.get("accept-encoding", ""))
+        etag = self.etag(encoding)
+        headers = {
+            "Cache-Control": self.cache_control,
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+        }
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(self.encodings[encoding], media_type=self.media_type, headers=headers)
+
+
+def _media_type(path: Path) -> str:
+    return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+def _hashed_name(path: Path, body: bytes) -> str:
+    digest = hashlib.sha256(body).hexdigest()[:10]
+    return f"{path.stem}.{digest}{path.suffix}"
+
+
+class AssetManifest:
+    """Maps original static URLs to fingerprinted URLs and in-memory assets"""
+
+    def __init__(self):
+        self.urls: Dict[str, str] = {}
+        self.assets: Dict[str, Asset] = {}
+        self.index: Optional[Asset] = None
+
+    def add_directory(self, directory: Path, url_prefix: str) -> None:
+        """Fingerprint every file in directory, served at url_prefix/<name>"""
+        if not directory.exists():
+            return
+        for path in sorted(directory.rglob("*")):
+            if not path.is_file() or path.name == "index.html":
+                continue
+            body = path.read_bytes()
+            relative = path.relative_to(directory)
+            hashed = relative.with_name(_hashed_name(path, body)).as_posix()
+            key = f"{url_prefix.strip('/')}/{hashed}"
+            self.assets[key] = Asset(
+                body,
+                _media_type(path),
+                IMMUTABLE,
+                compress=path.suffix.lower() not in SKIP_COMPRESSION,
+            )
+            original = f"{url_prefix}/{relative.as_posix()}"
+            self.urls[original] = f"{HASHED_PREFIX}/{quote(key)}"
+
+    def set_index(self, index_path: Path) -> None:
+        """Load index.html with static references rewritten to hashed URLs"""
+        if not index_path.exists():
+            return
+        html = index_path.read_text()
+        for original, hashed in self.urls.items():
+            for form in {original, quote(original)}:
+                html = html.replace(f'"{form}"', f'"{hashed}"')
+        self.index = Asset(html.encode(), "text/html; charset=utf-8", REVALIDATE, compress=True)
+
+    def get(self, key: str) -> Optional[Asset]:
+        return self.assets.get(key)
@@ -0,0 +1,102 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import server.main as main
+from server.dataset_store import CompactDataset, DatasetCache, sample_homes, bytes_per_record
+
+client = TestClient(main.app)
+
+
+def test_round_trip_preserves_records():
+    """Test that materialized dicts match the original records"""
+    records = list(sample_homes(200))
+    dataset = CompactDataset.from_records(records)
+    assert len(dataset) == 200
+    assert dataset.to_dicts() == records
+    assert list(dataset.to_dicts()[0].keys()) == list(records[0].keys())
+
+
+def test_repeated_values_are_interned():
+    """Test that low-cardinality columns share one object per distinct value"""
+    records = [{"Builder_Name": "".join(["Len", "nar"]), "Id": str(i)} for i in range(10)]
+    builders = CompactDataset.from_records(records).column("Builder_Name")
+    assert len({id(name) for name in builders}) == 1
+
+
+def test_empty_dataset():
+    """Test that an empty dataset materializes to an empty list"""
+    dataset = CompactDataset.from_records([])
+    assert len(dataset) == 0
+    assert dataset.to_dicts() == []
+
+
+def test_compact_is_smaller_than_dicts():
+    """Test that the compact store uses fewer bytes per record"""
+    result = bytes_per_record(list(sample_homes(1000)))
+    assert result["compact"] < result["dicts"] / 2
+
+
+def test_dataset_cache_ttl_zero_disables():
+    """Test that a zero TTL never stores datasets"""
+    cache = DatasetCache(ttl=0)
+    assert cache.put("homes", [{"Id": "1"}]) is None
+    assert cache.get("homes") is None
+
+
+def test_dataset_cache_hit():
+    """Test that a stored dataset is returned until cleared"""
+    cache = DatasetCache(ttl=60)
+    cache.put("homes", [{"Id": "1"}])
+    assert cache.get("homes").to_dicts() == [{"Id": "1"}]
+    cache.clear()
+    assert cache.get("homes") is None
+
+
+def test_round_trip_keeps_bool_int_float_distinct():
+    """Test that equal-comparing bools, ints and floats keep their types"""
+    values = [True, 1, 1.0, True, False, 0, False, 0.0] * 3
+    dataset = CompactDataset.from_records([{"Flag": v} for v in values])
+    decoded = dataset.column("Flag")
+    assert [(type(v), v) for v in decoded] == [(type(v), v) for v in values]
+
+
+def test_mismatched_record_keys_are_rejected():
+    """Test that records with missing or extra keys raise instead of changing shape"""
+    with pytest.raises(ValueError):
+        CompactDataset.from_records([{"a": 1, "b": 2}, {"a": 3}])
+    with pytest.raises(ValueError):
+        CompactDataset.from_records([{"a": 1}, {"a": 3, "b": 4}])
+
+
+@pytest.fixture
+def seeded_cache(monkeypatch):
+    """A fresh dataset cache; any Salesforce call fails the test"""
+    cache = DatasetCache(ttl=60)
+    monkeypatch.setattr(main, "dataset_cache", cache)
+
+    def no_salesforce(*args, **kwargs):
+        raise AssertionError("Salesforce should not be contacted on a cache hit")
+
+    monkeypatch.setattr(main, "mint_access_token", no_salesforce)
+    return cache
+
+
+def test_homes_served_from_cache(seeded_cache):
+    """Test that /api/sf/homes returns cached records in the cache-miss shape"""
+    homes = list(sample_homes(5))
+    seeded_cache.put("homes", homes)
+    response = client.get("/api/sf/homes")
+    assert response.status_code == 200
+    assert response.json() == {"homes": homes, "totalSize": 5}
+
+
+def test_communities_served_from_cache(seeded_cache):
+    """Test that /api/sf/communities returns cached records in the cache-miss shape"""
+    communities = [
+        {"Division_Id": f"a0D{i}", "Division_Name": f"Division {i}", "Builder_Name": "Lennar", "HQ_State": "FL"}
+        for i in range(3)
+    ]
+    seeded_cache.put("communities", communities)
+    response = client.get("/api/sf/communities")
+    assert response.status_code == 200
+    assert response.json() == {"communities": communities, "totalSize": 3}
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server.main as main
+from server.soql import (
+    QueryCache,
+    QueryTemplate,
+    TemplateError,
+    TemplateRegistry,
+    cache_key,
+    normalize_soql,
+    soql_literal,
+)
+
+client = TestClient(main.app)
+
+
+def test_normalize_collapses_whitespace_outside_literals():
+    """Test that whitespace is collapsed but string literals are untouched"""
+    soql = "SELECT  Id,\n  Name FROM Account WHERE Name = 'A  B'"
+    assert normalize_soql(soql) == "SELECT Id, Name FROM Account WHERE Name = 'A  B'"
+
+
+def test_literal_escaping():
+    """Test that bound strings cannot break out of the literal"""
+    assert soql_literal("x' OR Name != '") == "'x\\' OR Name != \\''"
+    assert soql_literal("a\\b") == "'a\\\\b'"
+    assert soql_literal(True) == "true"
+    assert soql_literal(None) == "null"
+    assert soql_literal(["a", "b"]) == "('a', 'b')"
+
+
+def test_float_literals():
+    """Test that floats are written without exponents and non-finite ones are rejected"""
+    assert soql_literal(1e20) == "100000000000000000000"
+    assert soql_literal(1e-7) == "0.0000001"
+    assert soql_literal(2.5) == "2.5"
+    for value in (float("nan"), float("inf"), float("-inf")):
+        with pytest.raises(TemplateError):
+            soql_literal(value)
+
+
+def test_template_render():
+    """Test that placeholders are bound and missing params are rejected"""
+    template = QueryTemplate("t", "SELECT Id FROM Division__c WHERE National_Builder__c = :builder_id")
+    assert template.params == ["builder_id"]
+    assert template.render({"builder_id": "a01'"}).endswith("= 'a01\\''")
+    with pytest.raises(TemplateError):
+        template.render({})
+    with pytest.raises(TemplateError):
+        template.render({"builder_id": "a01", "other": 1})
+
+
+def test_template_ignores_colons_in_literals():
+    """Test that ':name' inside a string literal is not a placeholder"""
+    template = QueryTemplate("t", "SELECT Id FROM Account WHERE Name = ':not_a_param' AND Id = :id")
+    assert template.params == ["id"]
+
+
+def test_cache_key_normalizes():
+    """Test that equivalent SOQL maps to one key and the tooling flag is separate"""
+    assert cache_key("SELECT Id\nFROM Account") == cache_key("SELECT Id FROM Account")
+    assert cache_key("SELECT Id FROM Account") != cache_key("SELECT Id FROM Account", tooling=True)
+
+
+def test_cache_key_follows_bound_values():
+    """Test that params which render differently produce different keys"""
+    template = QueryTemplate("t", "SELECT Id FROM Account WHERE X__c = :x")
+    assert cache_key(template.render({"x": 1})) != cache_key(template.render({"x": True}))
+
+
+def test_query_cache_evicts_by_bytes():
+    """Test that the least recently used entries are evicted to stay under the byte budget"""
+    cache = QueryCache(max_bytes=100, ttl=60)
+    cache.put("a", b"x" * 40)
+    cache.put("b", b"y" * 40)
+    assert cache.get("a") == b"x" * 40  # "a" is now most recently used
+    cache.put("c", b"z" * 40)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size == 80
+    assert not cache.put("big", b"w" * 200)
+
+
+def test_query_cache_ttl_zero_disables():
+    """Test that a zero TTL turns the cache off"""
+    cache = QueryCache(max_bytes=1000, ttl=0)
+    assert not cache.put("a", b"{}")
+    assert cache.get("a") is None
+
+
+def test_sf_query_served_from_cache():
+    """Test that a cached result is returned without contacting Salesforce"""
+    main.query_cache.clear()
+    result = {"totalSize": 0, "done": True, "records": []}
+    main.query_cache.put(cache_key("SELECT Id FROM Account"), json.dumps(result).encode())
+    response = client.post("/api/sf/query", json={"soql": "SELECT  Id\nFROM Account"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == result
+    main.query_cache.clear()
+
+
+def test_sf_query_rejects_soql_and_template():
+    """Test that soql and template are mutually exclusive"""
+    response = client.post("/api/sf/query", json={"soql": "SELECT Id FROM Account", "template": "divisions_by_builder"})
+    assert response.status_code == 422
+
+
+def test_sf_query_non_finite_param(monkeypatch):
+    """Test that a non-finite float parameter is a 400"""
+    templates = TemplateRegistry()
+    templates.register("test_float", "SELECT Id FROM Account WHERE X__c = :x")
+    monkeypatch.setattr(main, "query_templates", templates)
+    # 1e400 overflows to inf when the request body is parsed
+    body = '{"template": "test_float", "params": {"x": 1e400}}'
+    response = client.post("/api/sf/query", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+
+
+def test_sf_query_unknown_template():
+    """Test that an unknown template name is a 400"""
+    response = client.post("/api/sf/query", json={"template": "nope"})
+    assert response.status_code == 400
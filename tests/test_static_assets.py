@@ -0,0 +1,92 @@
+import re
+
+from fastapi.testclient import TestClient
+from server.main import app
+
+client = TestClient(app)
+
+
+def _hashed_urls(html):
+    return re.findall(r'"(/hashed/[^"]+)"', html)
+
+
+def test_index_references_hashed_urls():
+    """Test that index.html is rewritten to fingerprinted asset URLs"""
+    response = client.get("/")
+    assert response.status_code == 200
+    html = response.text
+    assert '"/static/app.js"' not in html
+    assert '"/static/styles.css"' not in html
+    assert re.search(r'"/hashed/static/app\.[0-9a-f]{10}\.js"', html)
+    assert re.search(r'"/hashed/static/styles\.[0-9a-f]{10}\.css"', html)
+
+
+def test_index_revalidates_with_etag():
+    """Test that a repeat index load with the ETag is a 304"""
+    first = client.get("/")
+    assert first.headers["cache-control"] == "no-cache"
+    second = client.get("/", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+
+
+def test_hashed_assets_are_immutable():
+    """Test that every referenced hashed asset is served with immutable caching"""
+    urls = _hashed_urls(client.get("/").text)
+    assert urls
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+
+
+def test_hashed_asset_compression():
+    """Test that text assets are served precompressed when accepted"""
+    url = next(u for u in _hashed_urls(client.get("/").text) if u.endswith(".js"))
+    gz = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert gz.content == plain.content
+
+
+def test_unknown_hashed_asset():
+    """Test that an unknown hashed URL returns 404"""
+    response = client.get("/hashed/static/missing.0000000000.js")
+    assert response.status_code == 404
+
+
+def test_unhashed_static_still_served():
+    """Test that the original static mount keeps working"""
+    response = client.get("/static/styles.css")
+    assert response.status_code == 200
+
+
+def test_hashed_asset_respects_q_zero():
+    """Test that an encoding refused with q=0 is not used"""
+    url = next(u for u in _hashed_urls(client.get("/").text) if u.endswith(".js"))
+    response = client.get(url, headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in response.headers
+    response = client.get(url, headers={"Accept-Encoding": "br;q=0, *"})
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_etag_differs_per_encoding():
+    """Test that each representation has its own ETag and If-None-Match compares whole tags"""
+    url = next(u for u in _hashed_urls(client.get("/").text) if u.endswith(".js"))
+    gz = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert gz.headers["etag"] != plain.headers["etag"]
+    mismatch = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": gz.headers["etag"]})
+    assert mismatch.status_code == 200
+    listed = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": f'"x", {gz.headers["etag"]}'})
+    assert listed.status_code == 304
+    star = client.get(url, headers={"If-None-Match": "*"})
+    assert star.status_code == 304
+
+
+def test_hashed_asset_head():
+    """Test that HEAD works on hashed asset URLs"""
+    url = _hashed_urls(client.get("/").text)[0]
+    response = client.head(url)
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]